@@ -2,20 +2,23 @@
 Configuration management for the Find BGM MCP server.
 """
 import os
+import sys
 from dataclasses import dataclass
-from typing import List, Dict
+from functools import cache
+from typing import List, Dict, Tuple
 
 
-@dataclass
+@dataclass(frozen=True)
 class ServerConfig:
     """Server configuration settings."""
     name: str = "find-bgm-server"
     version: str = "0.1.0"
     log_level: str = "INFO"
     oauth_file: str = "oauth.json"
+    max_concurrent_requests: int = 16
 
 
-@dataclass
+@dataclass(frozen=True)
 class AudioConfig:
     """Audio and music-related configuration."""
     max_duration_seconds: int = 300  # 5 minutes
@@ -23,25 +26,46 @@ class AudioConfig:
     max_search_terms: int = 5
     max_search_results: int = 20
     max_recommendations: int = 5
+    search_cache_size: int = 512
+    search_cache_ttl_seconds: int = 3600  # 1 hour
+    empty_term_reset_seconds: int = 86400  # 1 day
+
+
+def _invert_keywords(category_keywords: Dict[str, List[str]]) -> Dict[str, Tuple[str, ...]]:
+    """Map each keyword to the categories that list it, in definition order."""
+    index: Dict[str, Tuple[str, ...]] = {}
+    for category, keywords in category_keywords.items():
+        for keyword in keywords:
+            index[keyword] = index.get(keyword, ()) + (category,)
+    return index
 
 
 class ContentCategories:
     """Content categorization constants."""
     
-    GENRES = [
+    # Ordered tuples for display (e.g. tool schema enums) and frozensets
+    # for membership checks. Names are interned so comparisons against
+    # values derived from them can short-circuit on identity.
+    GENRES_ORDERED = tuple(sys.intern(genre) for genre in (
         "pop", "electronic", "chill", "rock", "hip-hop", 
         "classical", "ambient", "any"
-    ]
+    ))
+    GENRES = frozenset(GENRES_ORDERED)
     
-    MOODS = [
+    MOODS_ORDERED = tuple(sys.intern(mood) for mood in (
         "upbeat", "calm", "dramatic", "energetic", 
         "relaxed", "motivational", "any"
-    ]
+    ))
+    MOODS = frozenset(MOODS_ORDERED)
     
-    CONTENT_TYPES = [
+    CONTENT_TYPES_ORDERED = tuple(sys.intern(content_type) for content_type in (
         "comedy", "educational", "lifestyle", "fitness", 
         "cooking", "travel", "tech", "other"
-    ]
+    ))
+    CONTENT_TYPES = frozenset(CONTENT_TYPES_ORDERED)
+    
+    # Title terms that mark a track as background-friendly
+    BACKGROUND_MARKERS = frozenset({"instrumental", "background", "bgm"})
     
     MOOD_KEYWORDS: Dict[str, List[str]] = {
         'upbeat': ['excited', 'happy', 'energetic', 'fun', 'celebration', 'party', 'awesome', 'amazing'],
@@ -60,13 +84,26 @@ class ContentCategories:
         'lifestyle': ['daily', 'routine', 'life', 'lifestyle', 'personal', 'self-care'],
         'educational': ['learn', 'education', 'tutorial', 'how-to', 'explain', 'guide', 'tips']
     }
+    
+    # Reverse indexes from keyword to the categories it signals, so a
+    # script's tokens can be classified with one lookup each
+    KEYWORD_TO_MOODS: Dict[str, Tuple[str, ...]] = _invert_keywords(MOOD_KEYWORDS)
+    KEYWORD_TO_THEMES: Dict[str, Tuple[str, ...]] = _invert_keywords(THEME_KEYWORDS)
 
 
+@cache
 def get_config() -> tuple[ServerConfig, AudioConfig]:
-    """Get configuration from environment variables or defaults."""
+    """
+    Get configuration from environment variables or defaults.
+    
+    The environment is read once per process; later calls return the same
+    frozen config objects.
+    """
     server_config = ServerConfig(
         log_level=os.getenv("BGM_LOG_LEVEL", "INFO"),
         oauth_file=os.getenv("BGM_OAUTH_FILE", "oauth.json"),
+        # At least one request must be allowed through, or every call blocks
+        max_concurrent_requests=max(int(os.getenv("BGM_MAX_CONCURRENT", "16")), 1),
     )
     
     audio_config = AudioConfig(
@@ -75,6 +112,9 @@ def get_config() -> tuple[ServerConfig, AudioConfig]:
         max_search_terms=int(os.getenv("BGM_MAX_SEARCH_TERMS", "5")),
         max_search_results=int(os.getenv("BGM_MAX_SEARCH_RESULTS", "20")),
         max_recommendations=int(os.getenv("BGM_MAX_RECOMMENDATIONS", "5")),
+        search_cache_size=int(os.getenv("BGM_SEARCH_CACHE_SIZE", "512")),
+        search_cache_ttl_seconds=int(os.getenv("BGM_SEARCH_CACHE_TTL", "3600")),
+        empty_term_reset_seconds=int(os.getenv("BGM_EMPTY_TERM_RESET", "86400")),
     )
     
     return server_config, audio_config
\ No newline at end of file
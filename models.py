@@ -1,23 +1,25 @@
 """
 Data models for the Find BGM MCP server.
 """
-from dataclasses import dataclass
-from typing import List, Dict, Any
+from dataclasses import asdict, dataclass, field
+from typing import List, Dict, Any, Tuple
 
+from config import ContentCategories
 
-@dataclass
+
+@dataclass(frozen=True, slots=True)
 class ScriptAnalysis:
     """Results of script content analysis."""
     detected_mood: str
     detected_theme: str
     pacing: str
     sentiment_score: float
-    keywords: List[str]
-    all_detected_moods: List[str]
-    all_detected_themes: List[str]
+    keywords: Tuple[str, ...]
+    all_detected_moods: Tuple[str, ...]
+    all_detected_themes: Tuple[str, ...]
 
 
-@dataclass
+@dataclass(slots=True)
 class MusicRecommendation:
     """A single music recommendation."""
     title: str
@@ -29,7 +31,14 @@ class MusicRecommendation:
     loop_suitable: bool
 
 
-@dataclass
+@dataclass(slots=True)
+class RecommendationResult:
+    """Recommendations together with the search terms used to find them."""
+    recommendations: List[MusicRecommendation]
+    search_terms: List[str]
+
+
+@dataclass(slots=True)
 class RecommendationRequest:
     """Request parameters for music recommendations."""
     script: str
@@ -37,6 +46,11 @@ class RecommendationRequest:
     genre_preference: str = "any"
     mood_preference: str = "any"
     content_type: str = "other"
+    script_length: int = field(init=False)
+    
+    def __post_init__(self) -> None:
+        """Derive fields computed from the request inputs."""
+        self.script_length = len(self.script or "")
     
     def validate(self) -> None:
         """Validate request parameters."""
@@ -45,40 +59,43 @@ class RecommendationRequest:
         
         if not (15 <= self.duration <= 60):
             raise ValueError("Duration must be between 15 and 60 seconds")
+        
+        if self.genre_preference not in ContentCategories.GENRES:
+            raise ValueError(f"Unknown genre preference: {self.genre_preference}")
+        
+        if self.mood_preference not in ContentCategories.MOODS:
+            raise ValueError(f"Unknown mood preference: {self.mood_preference}")
+        
+        if self.content_type not in ContentCategories.CONTENT_TYPES:
+            raise ValueError(f"Unknown content type: {self.content_type}")
+
+
+@dataclass(slots=True)
+class InputParameters:
+    """Request parameters echoed back in a response."""
+    script_length: int
+    duration: int
+    genre_preference: str
+    mood_preference: str
+    content_type: str
+
+
+@dataclass(slots=True)
+class SearchInfo:
+    """Details about the music search behind a response."""
+    search_terms_used: List[str]
+    total_recommendations: int
+    api_status: str
 
 
-@dataclass
+@dataclass(slots=True)
 class RecommendationResponse:
     """Complete response with analysis and recommendations."""
     analysis: ScriptAnalysis
     recommendations: List[MusicRecommendation]
-    input_parameters: Dict[str, Any]
-    search_info: Dict[str, Any]
+    input_parameters: InputParameters
+    search_info: SearchInfo
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
-        return {
-            "analysis": {
-                "detected_mood": self.analysis.detected_mood,
-                "detected_theme": self.analysis.detected_theme,
-                "pacing": self.analysis.pacing,
-                "sentiment_score": self.analysis.sentiment_score,
-                "keywords": self.analysis.keywords,
-                "all_detected_moods": self.analysis.all_detected_moods,
-                "all_detected_themes": self.analysis.all_detected_themes
-            },
-            "recommendations": [
-                {
-                    "title": rec.title,
-                    "artist": rec.artist,
-                    "youtube_music_id": rec.youtube_music_id,
-                    "confidence_score": rec.confidence_score,
-                    "reason": rec.reason,
-                    "duration": rec.duration,
-                    "loop_suitable": rec.loop_suitable
-                }
-                for rec in self.recommendations
-            ],
-            "input_parameters": self.input_parameters,
-            "search_info": self.search_info
-        }
\ No newline at end of file
+        return asdict(self)
@@ -1,21 +1,78 @@
 """
 Music search and recommendation service using YouTube Music API.
 """
-from typing import Dict, List
+from collections import OrderedDict
+from functools import lru_cache, partial
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import heapq
 import logging
+import time
 
-from config import AudioConfig
-from models import ScriptAnalysis, MusicRecommendation
+from config import AudioConfig, ContentCategories
+from models import ScriptAnalysis, MusicRecommendation, RecommendationResult
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _score_title(title_lower: str, target_mood: str, theme: str,
+                 genre_preference: str, keywords: Tuple[str, ...]) -> float:
+    """
+    Calculate how well a track title matches the requirements.
+    
+    Takes only hashable inputs so that titles recurring across requests
+    are scored once.
+    
+    Args:
+        title_lower: Lowercased track title
+        target_mood: Preferred mood, or the detected one
+        theme: Detected script theme
+        genre_preference: User's genre preference
+        keywords: Top script keywords
+        
+    Returns:
+        Match score between 0.5 and 1.0
+    """
+    score = 0.5  # Base score
+    
+    # Mood matching
+    if target_mood in title_lower:
+        score += 0.3
+    
+    # Theme matching
+    if theme in title_lower:
+        score += 0.2
+    
+    # Keyword matching
+    for keyword in keywords:
+        if keyword in title_lower:
+            score += 0.1
+    
+    # Prefer instrumental/background tracks
+    if any(term in title_lower for term in ContentCategories.BACKGROUND_MARKERS):
+        score += 0.2
+    
+    # Bonus for exact genre match
+    if genre_preference != "any" and genre_preference in title_lower:
+        score += 0.15
+    
+    return min(score, 1.0)  # Cap at 1.0
+
+
 class YouTubeMusicService:
     """Service for interacting with YouTube Music API."""
     
     def __init__(self, yt_music_client=None, config: AudioConfig = None):
         self.client = yt_music_client
         self.config = config or AudioConfig()
+        # (term, limit) -> (expiry time, raw results), least recently used first
+        self._term_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Dict]]]" = OrderedDict()
+        # term -> shortest target duration for which it yielded no usable tracks
+        self._empty_terms: Dict[str, int] = {}
+        self._empty_terms_reset_at = time.monotonic() + self.config.empty_term_reset_seconds
+        # (term, limit) -> in-flight upstream search, shared by concurrent callers
+        self._pending_searches: Dict[Tuple[str, int], asyncio.Future] = {}
     
     async def search_tracks(self, search_terms: List[str], target_duration: int) -> List[Dict]:
         """
@@ -34,59 +91,154 @@ class YouTubeMusicService:
         
         all_results = []
         
-        try:
-            for term in search_terms:
-                logger.debug(f"Searching for: {term}")
-                results = self.client.search(
-                    term, 
-                    filter="songs", 
-                    limit=self.config.search_limit_per_term
-                )
+        # Skip terms already known to yield nothing usable at this duration
+        self._maybe_reset_empty_terms()
+        search_terms = [term for term in search_terms
+                        if not self._is_known_empty(term, target_duration)]
+        
+        # Start all term searches concurrently, but consume them in term order
+        # so earlier (higher priority) terms fill the quota first
+        searches = [self._start_search(term) for term in search_terms]
+        
+        # Deduplicate on videoId while collecting, stopping once the quota is met
+        seen_ids = set()
+        max_results = self.config.max_search_results
+        
+        # Tracks must cover the short without exceeding the maximum length;
+        # tracks without duration info are assumed suitable
+        min_duration = target_duration
+        max_duration = self.config.max_duration_seconds
+        failed_terms = 0
+        for term, search in zip(search_terms, searches):
+            try:
+                # Shielded so a cancelled request leaves shared searches running
+                results = await asyncio.shield(search)
+            except Exception as e:
+                logger.error("YouTube Music search failed for '%s': %s", term, e)
+                failed_terms += 1
+                continue
+            
+            has_suitable = False
+            for result in results:
+                duration = result.get('duration_seconds')
+                if duration is not None and not (min_duration <= duration <= max_duration):
+                    continue
+                has_suitable = True
                 
-                for result in results:
-                    if self._is_suitable_for_shorts(result, target_duration):
-                        all_results.append(result)
-                        
-        except Exception as e:
-            logger.error(f"YouTube Music search failed: {e}")
+                video_id = result.get('videoId')
+                if video_id and video_id not in seen_ids:
+                    seen_ids.add(video_id)
+                    all_results.append(result)
+                    if len(all_results) >= max_results:
+                        break
+            
+            if not has_suitable:
+                self._mark_empty(term, target_duration)
+            
+            if len(all_results) >= max_results:
+                break
+        
+        if search_terms and failed_terms == len(search_terms):
+            logger.error("All YouTube Music searches failed, using mock data")
             return self._get_mock_tracks(target_duration)
         
-        # Limit total results and remove duplicates
-        unique_results = self._deduplicate_tracks(all_results)
-        return unique_results[:self.config.max_search_results]
+        return all_results
     
-    def _is_suitable_for_shorts(self, track: Dict, target_duration: int) -> bool:
+    def _start_search(self, term: str) -> asyncio.Future:
         """
-        Check if a track is suitable for YouTube shorts.
+        Start a YouTube Music search for a single term, or join one in flight.
+        
+        Results are served from the term cache when possible. Otherwise the
+        blocking client call runs in a worker thread so that searches for
+        several terms can overlap. Searches are never cancelled: one whose
+        results are no longer needed still finishes and fills the cache.
         
         Args:
-            track: Track dictionary from YouTube Music
-            target_duration: Target duration in seconds
+            term: Search term
             
         Returns:
-            True if track is suitable, False otherwise
+            Future resolving to raw song results from YouTube Music
         """
-        # Check duration if available
-        if 'duration_seconds' in track:
-            duration = track['duration_seconds']
-            return (duration >= target_duration and 
-                   duration <= self.config.max_duration_seconds)
-        
-        # If no duration info, assume it's suitable
-        return True
+        cache_key = (term, self.config.search_limit_per_term)
+        cached = self._get_cached_results(cache_key)
+        if cached is not None:
+            logger.debug("Search cache hit for: %s", term)
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(cached)
+            return future
+        
+        search = self._pending_searches.get(cache_key)
+        if search is None:
+            logger.debug("Searching for: %s", term)
+            search = asyncio.ensure_future(asyncio.to_thread(
+                self.client.search,
+                term,
+                filter="songs",
+                limit=self.config.search_limit_per_term
+            ))
+            self._pending_searches[cache_key] = search
+            search.add_done_callback(partial(self._finish_search, cache_key))
+        return search
     
-    def _deduplicate_tracks(self, tracks: List[Dict]) -> List[Dict]:
-        """Remove duplicate tracks based on videoId."""
-        seen_ids = set()
-        unique_tracks = []
+    def _finish_search(self, cache_key: Tuple[str, int], search: asyncio.Future) -> None:
+        """Cache a finished search, whether or not any caller still awaits it."""
+        self._pending_searches.pop(cache_key, None)
+        if search.cancelled():
+            return
+        
+        # Retrieving the exception also keeps unawaited failures from being logged as lost
+        if search.exception() is None:
+            self._cache_results(cache_key, search.result())
+    
+    def _is_known_empty(self, term: str, target_duration: int) -> bool:
+        """
+        Check whether a term is known to yield no usable tracks.
+        
+        Suitable tracks must be at least as long as the target, so a term
+        that yielded nothing for a shorter target yields nothing for a
+        longer one either.
+        """
+        empty_from = self._empty_terms.get(term)
+        return empty_from is not None and target_duration >= empty_from
+    
+    def _mark_empty(self, term: str, target_duration: int) -> None:
+        """Record that a term yielded no usable tracks for a target duration."""
+        empty_from = self._empty_terms.get(term)
+        if empty_from is None or target_duration < empty_from:
+            self._empty_terms[term] = target_duration
+    
+    def _maybe_reset_empty_terms(self) -> None:
+        """Forget known-empty terms periodically so new catalogue entries surface."""
+        now = time.monotonic()
+        if now >= self._empty_terms_reset_at:
+            self._empty_terms.clear()
+            self._empty_terms_reset_at = now + self.config.empty_term_reset_seconds
+    
+    def _get_cached_results(self, cache_key: Tuple[str, int]) -> Optional[List[Dict]]:
+        """Return unexpired cached results for a search, if any."""
+        entry = self._term_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        expires_at, results = entry
+        if expires_at <= time.monotonic():
+            del self._term_cache[cache_key]
+            return None
+        
+        self._term_cache.move_to_end(cache_key)
+        return results
+    
+    def _cache_results(self, cache_key: Tuple[str, int], results: List[Dict]) -> None:
+        """Store search results, evicting the least recently used entries."""
+        if self.config.search_cache_size <= 0:
+            return
         
-        for track in tracks:
-            video_id = track.get('videoId')
-            if video_id and video_id not in seen_ids:
-                seen_ids.add(video_id)
-                unique_tracks.append(track)
+        expires_at = time.monotonic() + self.config.search_cache_ttl_seconds
+        self._term_cache[cache_key] = (expires_at, results)
+        self._term_cache.move_to_end(cache_key)
         
-        return unique_tracks
+        while len(self._term_cache) > self.config.search_cache_size:
+            self._term_cache.popitem(last=False)
     
     def _get_mock_tracks(self, duration: int) -> List[Dict]:
         """Return mock track data when YouTube Music API is unavailable."""
@@ -160,7 +312,7 @@ class MusicRecommendationService:
         return search_terms[:self.config.max_search_terms]
     
     async def get_recommendations(self, analysis: ScriptAnalysis, genre_preference: str,
-                                mood_preference: str, duration: int) -> List[MusicRecommendation]:
+                                mood_preference: str, duration: int) -> RecommendationResult:
         """
         Get music recommendations based on analysis and preferences.
         
@@ -171,86 +323,82 @@ class MusicRecommendationService:
             duration: Target duration in seconds
             
         Returns:
-            List of music recommendations
+            Recommendations and the search terms used to find them
         """
         # Generate search terms
         search_terms = self.generate_search_terms(analysis, genre_preference, mood_preference)
-        logger.info(f"Generated search terms: {search_terms}")
+        logger.info("Generated search terms: %s", search_terms)
         
         # Search for tracks
         tracks = await self.music_service.search_tracks(search_terms, duration)
-        logger.info(f"Found {len(tracks)} tracks")
+        logger.info("Found %d tracks", len(tracks))
         
         # Score and rank recommendations
         recommendations = self._score_and_rank_tracks(
-            tracks, analysis, genre_preference, mood_preference
+            tracks, analysis, genre_preference, mood_preference,
+            self.config.max_recommendations
         )
         
-        return recommendations[:self.config.max_recommendations]
+        return RecommendationResult(recommendations=recommendations, search_terms=search_terms)
     
     def _score_and_rank_tracks(self, tracks: List[Dict], analysis: ScriptAnalysis,
-                             genre_preference: str, mood_preference: str) -> List[MusicRecommendation]:
-        """Score and rank tracks based on relevance."""
-        scored_recommendations = []
+                             genre_preference: str, mood_preference: str,
+                             limit: int) -> List[MusicRecommendation]:
+        """
+        Score and rank tracks based on relevance.
         
-        for track in tracks:
-            score = self._calculate_match_score(track, analysis, genre_preference, mood_preference)
-            
-            recommendation = MusicRecommendation(
-                title=track.get("title", "Unknown Title"),
-                artist=self._extract_artist_name(track),
-                youtube_music_id=track.get("videoId", ""),
-                confidence_score=score,
-                reason=self._generate_recommendation_reason(track, analysis, score),
-                duration=track.get("duration_seconds", 30),
-                loop_suitable=track.get("duration_seconds", 30) >= 15
-            )
-            
-            scored_recommendations.append(recommendation)
+        All tracks are scored in one batch, but recommendation objects are
+        only built for the top `limit` tracks.
         
-        # Sort by confidence score (highest first)
-        return sorted(scored_recommendations, 
-                     key=lambda x: x.confidence_score, reverse=True)
-    
-    def _calculate_match_score(self, track: Dict, analysis: ScriptAnalysis,
-                             genre_preference: str, mood_preference: str) -> float:
-        """Calculate how well a track matches the requirements."""
-        score = 0.5  # Base score
-        title_lower = track.get("title", "").lower()
-        
-        # Mood matching
+        Args:
+            tracks: Track dictionaries from YouTube Music
+            analysis: Script analysis results
+            genre_preference: User's genre preference
+            mood_preference: User's mood preference
+            limit: Maximum number of recommendations to return
+            
+        Returns:
+            Recommendations sorted by confidence score (highest first)
+        """
+        # Request-wide scoring inputs, resolved once for all tracks
         target_mood = (mood_preference if mood_preference != "any" 
                       else analysis.detected_mood)
-        if target_mood in title_lower:
-            score += 0.3
-        
-        # Theme matching
-        if analysis.detected_theme in title_lower:
-            score += 0.2
+        theme = analysis.detected_theme
+        keywords = analysis.keywords[:5]
         
-        # Keyword matching
-        for keyword in analysis.keywords[:5]:
-            if keyword in title_lower:
-                score += 0.1
+        scores = [
+            _score_title(track.get("title", "").lower(), target_mood, theme,
+                         genre_preference, keywords)
+            for track in tracks
+        ]
         
-        # Prefer instrumental/background tracks
-        if any(term in title_lower for term in ["instrumental", "background", "bgm"]):
-            score += 0.2
+        # Highest scores first; ties keep search order like a stable sort
+        ranked = heapq.nlargest(limit, range(len(tracks)), key=scores.__getitem__)
         
-        # Bonus for exact genre match
-        if genre_preference != "any" and genre_preference in title_lower:
-            score += 0.15
+        recommendations = []
+        for index in ranked:
+            track = tracks[index]
+            score = scores[index]
+            duration = track.get("duration_seconds") or 30
+            recommendations.append(MusicRecommendation(
+                title=track.get("title", "Unknown Title"),
+                artist=self._extract_artist_name(track.get("artists")),
+                youtube_music_id=track.get("videoId", ""),
+                confidence_score=score,
+                reason=self._generate_recommendation_reason(analysis, score),
+                duration=duration,
+                loop_suitable=duration >= 15
+            ))
         
-        return min(score, 1.0)  # Cap at 1.0
+        return recommendations
     
-    def _extract_artist_name(self, track: Dict) -> str:
-        """Extract artist name from track data."""
-        artists = track.get("artists", [])
-        if artists and len(artists) > 0:
+    def _extract_artist_name(self, artists: Optional[List[Dict]]) -> str:
+        """Extract the primary artist name from a track's artist list."""
+        if artists:
             return artists[0].get("name", "Unknown Artist")
         return "Unknown Artist"
     
-    def _generate_recommendation_reason(self, track: Dict, analysis: ScriptAnalysis, score: float) -> str:
+    def _generate_recommendation_reason(self, analysis: ScriptAnalysis, score: float) -> str:
         """Generate explanation for why this track was recommended."""
         if score > 0.8:
             match_level = "Strong match"
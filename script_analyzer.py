@@ -1,27 +1,80 @@
 """
 Script analysis functionality for detecting mood, theme, and characteristics.
 """
-from typing import Dict, List
-from textblob import TextBlob
+from collections import OrderedDict
+from functools import cache
+from typing import Dict, FrozenSet, List, Tuple
+import hashlib
 import logging
+import re
+import threading
 
 from config import ContentCategories
 from models import ScriptAnalysis
 
 logger = logging.getLogger(__name__)
 
+# Word tokens, including hyphenated keywords such as "laid-back"
+_TOKEN_PATTERN = re.compile(r"[a-z][a-z\-]+")
+
+# Keywords at least this long also match longer tokens they prefix
+_MIN_PREFIX_LENGTH = 3
+
+# Keyword candidates: words of at least four letters, hyphens allowed
+_KEYWORD_PATTERN = re.compile(r"[a-z][a-z\-]{3,}")
+
+# Common words that carry no mood or topic signal
+_STOPWORDS = frozenset({
+    "about", "after", "again", "also", "because", "been", "before", "being",
+    "come", "could", "does", "doing", "done", "each", "even", "every",
+    "from", "gets", "give", "going", "have", "having", "here", "into",
+    "just", "know", "lets", "like", "make", "makes", "many", "more",
+    "most", "much", "must", "need", "only", "other", "over", "really",
+    "ready", "should", "some", "such", "take", "than", "that", "their",
+    "them", "then", "there", "these", "they", "thing", "things", "this",
+    "those", "through", "today", "very", "want", "well", "were", "what",
+    "when", "where", "which", "while", "will", "with", "would", "your",
+    "yours", "yourself",
+})
+
+
+@cache
+def _textblob_cls():
+    """Import TextBlob on first use; loading it and its NLTK data is slow."""
+    from textblob import TextBlob
+    return TextBlob
+
 
 class ScriptAnalyzer:
     """Analyzes YouTube short scripts to extract mood, theme, and characteristics."""
     
-    def __init__(self):
+    # Analyses shared by all instances, keyed by (script digest, use_pos_tagging).
+    # Analysis may run in worker threads, so cache access is locked.
+    _CACHE_SIZE = 256
+    _cache: "OrderedDict[Tuple[bytes, bool], ScriptAnalysis]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+    
+    def __init__(self, use_pos_tagging: bool = False):
+        """
+        Args:
+            use_pos_tagging: Extract keywords with TextBlob part-of-speech
+                tagging instead of the faster stopword filter
+        """
+        self.use_pos_tagging = use_pos_tagging
         self.mood_keywords = ContentCategories.MOOD_KEYWORDS
         self.theme_keywords = ContentCategories.THEME_KEYWORDS
+        self.keyword_to_moods = ContentCategories.KEYWORD_TO_MOODS
+        self.keyword_to_themes = ContentCategories.KEYWORD_TO_THEMES
     
     def analyze_script(self, script: str) -> ScriptAnalysis:
         """
         Analyze script text and return comprehensive analysis.
         
+        Results are cached by a digest of the script, so analyzing the same
+        text again returns the earlier result.
+        
         Args:
             script: The video script text to analyze
             
@@ -31,64 +84,159 @@ class ScriptAnalyzer:
         if not script or not script.strip():
             raise ValueError("Script cannot be empty")
         
+        cache_key = self.cache_key(script)
+        
+        cls = type(self)
+        with cls._cache_lock:
+            analysis = cls._cache.get(cache_key)
+            if analysis is not None:
+                cls._cache.move_to_end(cache_key)
+                cls._cache_hits += 1
+                return analysis
+            cls._cache_misses += 1
+        
+        analysis = self._analyze(script)
+        
+        with cls._cache_lock:
+            cls._cache[cache_key] = analysis
+            if len(cls._cache) > cls._CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        
+        return analysis
+    
+    def cache_key(self, script: str) -> Tuple[bytes, bool]:
+        """Return the key identifying this analyzer's analysis of a script."""
+        digest = hashlib.blake2b(script.encode("utf-8"), digest_size=16).digest()
+        return (digest, self.use_pos_tagging)
+    
+    def warm_up(self) -> None:
+        """
+        Load TextBlob and its sentiment lexicon ahead of the first request.
+        
+        Loading happens lazily on first use and takes noticeably longer than
+        an analysis itself, so servers call this in the background at startup.
+        """
+        try:
+            _textblob_cls()("warm up").sentiment
+        except Exception as e:
+            logger.warning("Analyzer warm-up failed: %s", e)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop all cached analyses and reset the hit statistics."""
+        with cls._cache_lock:
+            cls._cache.clear()
+            cls._cache_hits = 0
+            cls._cache_misses = 0
+    
+    @classmethod
+    def cache_info(cls) -> Dict[str, int]:
+        """Return analysis cache statistics."""
+        with cls._cache_lock:
+            return {
+                "hits": cls._cache_hits,
+                "misses": cls._cache_misses,
+                "size": len(cls._cache),
+                "max_size": cls._CACHE_SIZE
+            }
+    
+    def _analyze(self, script: str) -> ScriptAnalysis:
+        """Run the full analysis pipeline on a non-empty script."""
         script_lower = script.lower()
+        tokens = self._tokenize(script_lower)
         
         # Perform sentiment analysis
         sentiment = self._analyze_sentiment(script)
         
         # Detect mood and theme based on keywords
-        detected_moods = self._detect_moods(script_lower)
-        detected_themes = self._detect_themes(script_lower)
+        mood_hits = self._detect_moods(tokens)
+        theme_hits = self._detect_themes(tokens)
         
         # Analyze pacing
         pacing = self._analyze_pacing(script)
         
         # Extract keywords
-        keywords = self._extract_keywords(script)
+        keywords = self._extract_keywords(script, script_lower)
         
         # Determine primary mood and theme
-        primary_mood = self._determine_primary_mood(detected_moods, sentiment.polarity)
-        primary_theme = detected_themes[0] if detected_themes else "general"
+        primary_mood = self._determine_primary_mood(mood_hits, sentiment.polarity)
+        primary_theme = max(theme_hits, key=theme_hits.get) if theme_hits else "general"
         
-        logger.info(f"Script analysis: mood={primary_mood}, theme={primary_theme}, pacing={pacing}")
+        logger.info("Script analysis: mood=%s, theme=%s, pacing=%s", primary_mood, primary_theme, pacing)
         
         return ScriptAnalysis(
             detected_mood=primary_mood,
             detected_theme=primary_theme,
             pacing=pacing,
             sentiment_score=sentiment.polarity,
-            keywords=keywords[:10],  # Top 10 keywords
-            all_detected_moods=detected_moods,
-            all_detected_themes=detected_themes
+            keywords=tuple(keywords[:10]),  # Top 10 keywords
+            all_detected_moods=tuple(mood_hits),
+            all_detected_themes=tuple(theme_hits)
         )
     
     def _analyze_sentiment(self, script: str) -> any:
         """Analyze sentiment using TextBlob."""
         try:
-            blob = TextBlob(script)
+            blob = _textblob_cls()(script)
             return blob.sentiment
         except Exception as e:
-            logger.warning(f"Sentiment analysis failed: {e}")
+            logger.warning("Sentiment analysis failed: %s", e)
             # Return neutral sentiment as fallback
             from collections import namedtuple
             Sentiment = namedtuple('Sentiment', ['polarity', 'subjectivity'])
             return Sentiment(0.0, 0.0)
     
-    def _detect_moods(self, script_lower: str) -> List[str]:
-        """Detect moods based on keyword matching."""
-        detected_moods = []
-        for mood, keywords in self.mood_keywords.items():
-            if any(keyword in script_lower for keyword in keywords):
-                detected_moods.append(mood)
-        return detected_moods
-    
-    def _detect_themes(self, script_lower: str) -> List[str]:
-        """Detect themes based on keyword matching."""
-        detected_themes = []
-        for theme, keywords in self.theme_keywords.items():
-            if any(keyword in script_lower for keyword in keywords):
-                detected_themes.append(theme)
-        return detected_themes
+    def _tokenize(self, script_lower: str) -> FrozenSet[str]:
+        """Split lowercased script text into a set of word tokens."""
+        return frozenset(_TOKEN_PATTERN.findall(script_lower))
+    
+    def _detect_moods(self, tokens: FrozenSet[str]) -> Dict[str, int]:
+        """Detect moods by looking up script tokens in the mood keyword index."""
+        return self._count_hits(tokens, self.keyword_to_moods, self.mood_keywords)
+    
+    def _detect_themes(self, tokens: FrozenSet[str]) -> Dict[str, int]:
+        """Detect themes by looking up script tokens in the theme keyword index."""
+        return self._count_hits(tokens, self.keyword_to_themes, self.theme_keywords)
+    
+    def _count_hits(self, tokens: FrozenSet[str],
+                    keyword_index: Dict[str, Tuple[str, ...]],
+                    categories: Dict[str, List[str]]) -> Dict[str, int]:
+        """
+        Count matching keywords per category in a single pass over the tokens.
+        
+        Keywords match as token prefixes so inflected forms still count
+        ("recipes" matches "recipe", "traveling" matches "travel"). Only the
+        longest keyword prefixing a token counts, so "technology" is not
+        also scored as "tech"; keywords shorter than the minimum prefix
+        length only match whole tokens.
+        
+        Args:
+            tokens: Word tokens from the script
+            keyword_index: Mapping of keyword to the categories it signals
+            categories: Category definitions, used for result ordering
+            
+        Returns:
+            Mapping of matched category to number of matching keywords,
+            in category definition order
+        """
+        matched = set()
+        for token in tokens:
+            if len(token) < _MIN_PREFIX_LENGTH:
+                if token in keyword_index:
+                    matched.add(token)
+                continue
+            for end in range(len(token), _MIN_PREFIX_LENGTH - 1, -1):
+                prefix = token[:end]
+                if prefix in keyword_index:
+                    matched.add(prefix)
+                    break
+        
+        counts: Dict[str, int] = {}
+        for keyword in matched:
+            for category in keyword_index[keyword]:
+                counts[category] = counts.get(category, 0) + 1
+        
+        return {category: counts[category] for category in categories if category in counts}
     
     def _analyze_pacing(self, script: str) -> str:
         """
@@ -101,7 +249,7 @@ class ScriptAnalyzer:
             Pacing classification: "fast", "medium", or "slow"
         """
         exclamation_count = script.count('!')
-        sentence_count = len([s for s in script.split('.') if s.strip()])
+        sentence_count = sum(1 for s in script.split('.') if s and not s.isspace())
         word_count = len(script.split())
         avg_sentence_length = word_count / max(sentence_count, 1)
         
@@ -114,49 +262,56 @@ class ScriptAnalyzer:
         else:
             return "medium"
     
-    def _extract_keywords(self, script: str) -> List[str]:
+    def _extract_keywords(self, script: str, script_lower: str) -> List[str]:
         """
         Extract meaningful keywords from the script.
         
         Args:
             script: The script text
+            script_lower: The lowercased script text
             
         Returns:
             List of extracted keywords
         """
-        try:
-            blob = TextBlob(script)
-            keywords = []
-            
-            # Extract nouns and adjectives longer than 3 characters
-            for word, pos in blob.tags:
-                if (pos in ['NN', 'NNS', 'JJ', 'JJR', 'JJS'] and 
-                    len(word) > 3 and word.isalpha()):
-                    keywords.append(word.lower())
-            
-            # Remove duplicates while preserving order
-            return list(dict.fromkeys(keywords))
-            
-        except Exception as e:
-            logger.warning(f"Keyword extraction failed: {e}")
-            # Fallback: simple word extraction
-            words = script.lower().split()
-            return [word for word in words if len(word) > 3 and word.isalpha()][:10]
+        if self.use_pos_tagging:
+            try:
+                return self._extract_tagged_keywords(script)
+            except Exception as e:
+                logger.warning("Keyword extraction failed: %s", e)
+        
+        words = _KEYWORD_PATTERN.findall(script_lower)
+        
+        # Remove stopwords and duplicates while preserving order
+        return list(dict.fromkeys(word for word in words if word not in _STOPWORDS))
+    
+    def _extract_tagged_keywords(self, script: str) -> List[str]:
+        """Extract nouns and adjectives using TextBlob part-of-speech tags."""
+        blob = _textblob_cls()(script)
+        keywords = []
+        
+        # Extract nouns and adjectives longer than 3 characters
+        for word, pos in blob.tags:
+            if (pos in ['NN', 'NNS', 'JJ', 'JJR', 'JJS'] and 
+                len(word) > 3 and word.isalpha()):
+                keywords.append(word.lower())
+        
+        # Remove duplicates while preserving order
+        return list(dict.fromkeys(keywords))
     
-    def _determine_primary_mood(self, detected_moods: List[str], sentiment_polarity: float) -> str:
+    def _determine_primary_mood(self, mood_hits: Dict[str, int], sentiment_polarity: float) -> str:
         """
         Determine the primary mood from detected moods and sentiment.
         
         Args:
-            detected_moods: List of detected moods from keywords
+            mood_hits: Detected moods mapped to their keyword match counts
             sentiment_polarity: Sentiment polarity score
             
         Returns:
             Primary mood string
         """
-        # Use keyword-detected mood if available
-        if detected_moods:
-            return detected_moods[0]
+        # Use the strongest keyword-detected mood if available
+        if mood_hits:
+            return max(mood_hits, key=mood_hits.get)
         
         # Fall back to sentiment-based mood
         if sentiment_polarity < -0.1:
@@ -7,6 +7,7 @@ background music for their shorts by analyzing script content and recommending
 tracks from YouTube Music.
 """
 import asyncio
+import functools
 import logging
 import os
 from typing import Any, Dict, List
@@ -21,6 +22,9 @@ from config import get_config, ServerConfig, AudioConfig
 from music_service import YouTubeMusicService, MusicRecommendationService
 from tools import BGMTools
 
+# Matches the timeout ytmusicapi sets on the sessions it creates itself
+_HTTP_TIMEOUT_SECONDS = 30
+
 
 class FindBGMServer:
     """Main server class for the Find BGM MCP server."""
@@ -35,7 +39,10 @@ class FindBGMServer:
         self.youtube_music_client = self._initialize_youtube_music()
         self.music_service = YouTubeMusicService(self.youtube_music_client, audio_config)
         self.recommendation_service = MusicRecommendationService(self.music_service, audio_config)
-        self.tools = BGMTools(self.recommendation_service)
+        self.tools = BGMTools(
+            self.recommendation_service,
+            max_concurrent_requests=server_config.max_concurrent_requests
+        )
         
         # Register handlers
         self._register_handlers()
@@ -56,20 +63,43 @@ class FindBGMServer:
             oauth_path = os.path.join(os.path.dirname(__file__), self.server_config.oauth_file)
             
             if os.path.exists(oauth_path):
-                client = YTMusic(oauth_path)
+                client = YTMusic(oauth_path, requests_session=self._create_http_session())
                 self.logger.info("YouTube Music API initialized successfully")
                 return client
             else:
-                self.logger.warning(f"{self.server_config.oauth_file} not found. Using mock recommendations.")
+                self.logger.warning("%s not found. Using mock recommendations.", self.server_config.oauth_file)
                 return None
                 
         except ImportError:
             self.logger.warning("ytmusicapi not installed. Using mock recommendations.")
             return None
         except Exception as e:
-            self.logger.error(f"Failed to initialize YouTube Music API: {e}")
+            self.logger.error("Failed to initialize YouTube Music API: %s", e)
             return None
     
+    def _create_http_session(self):
+        """
+        Create the HTTP session for the YouTube Music client.
+        
+        Term searches from concurrent requests run in parallel worker
+        threads, so the connection pool is sized to hold one connection per
+        search term for every concurrent request; requests' default pool of
+        ten would otherwise open and discard overflow connections. The
+        request timeout ytmusicapi applies to its own sessions is kept.
+        """
+        import requests
+        from requests.adapters import HTTPAdapter
+        
+        pool_size = max(
+            self.audio_config.max_search_terms * self.server_config.max_concurrent_requests, 1
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        
+        session = requests.Session()
+        session.request = functools.partial(session.request, timeout=_HTTP_TIMEOUT_SECONDS)
+        session.mount("https://", adapter)
+        return session
+    
     def _register_handlers(self):
         """Register MCP server handlers."""
         
@@ -85,7 +115,10 @@ class FindBGMServer:
     
     async def run(self):
         """Run the MCP server."""
-        self.logger.info(f"Starting {self.server_config.name} v{self.server_config.version}")
+        self.logger.info("Starting %s v%s", self.server_config.name, self.server_config.version)
+        
+        # Pay the one-time NLP model load in the background, not on the first request
+        warm_up_task = asyncio.create_task(asyncio.to_thread(self.tools.script_analyzer.warm_up))
         
         try:
             async with stdio_server() as (read_stream, write_stream):
@@ -102,8 +135,10 @@ class FindBGMServer:
                     ),
                 )
         except Exception as e:
-            self.logger.error(f"Server error: {e}", exc_info=True)
+            self.logger.error("Server error: %s", e, exc_info=True)
             raise
+        finally:
+            warm_up_task.cancel()
 
 
 async def main():
@@ -119,9 +154,25 @@ async def main():
     except KeyboardInterrupt:
         logging.info("Server stopped by user")
     except Exception as e:
-        logging.error(f"Fatal error: {e}", exc_info=True)
+        logging.error("Fatal error: %s", e, exc_info=True)
         raise SystemExit(1)
 
 
+def _run(coro) -> None:
+    """Run a coroutine on uvloop when it is installed, else on the default loop."""
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    # uvloop.run only exists from uvloop 0.18
+    uvloop_run = getattr(uvloop, "run", None)
+    if uvloop_run is None:
+        asyncio.run(coro)
+        return
+    
+    uvloop_run(coro)
+
+
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    _run(main())
\ No newline at end of file
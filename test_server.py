@@ -4,8 +4,9 @@ Test script for the Find BGM MCP server
 """
 import asyncio
 import logging
+import time
 
-from config import get_config
+from config import AudioConfig, get_config
 from script_analyzer import ScriptAnalyzer
 from music_service import YouTubeMusicService, MusicRecommendationService
 from models import RecommendationRequest
@@ -14,6 +15,34 @@ from models import RecommendationRequest
 logging.basicConfig(level=logging.INFO)
 
 
+class FakeYTMusicClient:
+    """Stand-in for the YouTube Music client that records its searches."""
+    
+    def __init__(self, results_by_term, slow_terms=()):
+        self.results_by_term = results_by_term
+        self.slow_terms = slow_terms
+        self.searched_terms = []
+    
+    def search(self, term, filter=None, limit=None):
+        self.searched_terms.append(term)
+        if term in self.slow_terms:
+            time.sleep(0.05)
+        return self.results_by_term.get(term, [])
+
+
+class CountingScriptAnalyzer(ScriptAnalyzer):
+    """Script analyzer that counts and slows down the analyses it runs."""
+    
+    def __init__(self):
+        super().__init__()
+        self.analysis_count = 0
+    
+    def _analyze(self, script):
+        self.analysis_count += 1
+        time.sleep(0.05)
+        return super()._analyze(script)
+
+
 async def test_components():
     """Test the Find BGM components."""
     print("Testing Find BGM Components")
@@ -57,12 +86,12 @@ async def test_components():
     print("\n3. Testing Recommendations")
     print("-" * 30)
     
-    recommendations = await recommendation_service.get_recommendations(
+    result = await recommendation_service.get_recommendations(
         analysis, "electronic", "energetic", 30
     )
     
-    print(f"Generated {len(recommendations)} recommendations:")
-    for i, rec in enumerate(recommendations, 1):
+    print(f"Generated {len(result.recommendations)} recommendations:")
+    for i, rec in enumerate(result.recommendations, 1):
         print(f"  {i}. {rec.title} by {rec.artist}")
         print(f"     Score: {rec.confidence_score:.2f} - {rec.reason}")
         print(f"     Duration: {rec.duration}s")
@@ -92,6 +121,147 @@ async def test_components():
     except ValueError as e:
         print(f"✅ Invalid request correctly rejected: {e}")
     
+    # Test unknown preference
+    try:
+        unknown_genre_request = RecommendationRequest(
+            script=test_script,
+            duration=45,
+            genre_preference="jazz"
+        )
+        unknown_genre_request.validate()
+        print("❌ Unknown genre should have failed")
+    except ValueError as e:
+        print(f"✅ Unknown genre correctly rejected: {e}")
+    
+    # Test keyword matching on inflected words
+    print("\n5. Testing Keyword Inflections")
+    print("-" * 30)
+    
+    theme_cases = [
+        ("Cooking tips: my favorite recipes for a quick dinner", "cooking"),
+        ("Workouts and exercises to build muscles fast", "fitness"),
+        ("Traveling the world, exploring hidden destinations", "travel"),
+        ("My daily routine, now with technology.", "lifestyle"),
+    ]
+    for script, expected_theme in theme_cases:
+        detected = analyzer.analyze_script(script).detected_theme
+        if detected == expected_theme:
+            print(f"✅ '{script[:30]}...' detected as {detected}")
+        else:
+            print(f"❌ '{script[:30]}...' detected as {detected}, expected {expected_theme}")
+    
+    goals_analysis = analyzer.analyze_script("Write down your goals and chase them")
+    if "motivational" in goals_analysis.all_detected_moods:
+        print("✅ 'goals' matched the motivational keyword 'goal'")
+    else:
+        print(f"❌ 'goals' not matched as motivational: {goals_analysis.all_detected_moods}")
+    
+    # Test skipping of search terms known to come back empty
+    print("\n6. Testing Empty Search Terms")
+    print("-" * 30)
+    
+    # Caching disabled so every search that is not skipped reaches the client
+    no_cache_config = AudioConfig(search_cache_size=0)
+    empty_client = FakeYTMusicClient({"obscure term": []})
+    empty_service = YouTubeMusicService(empty_client, no_cache_config)
+    
+    await empty_service.search_tracks(["obscure term"], 30)
+    await empty_service.search_tracks(["obscure term"], 45)
+    if empty_client.searched_terms.count("obscure term") == 1:
+        print("✅ Empty term skipped for a longer duration")
+    else:
+        print("❌ Empty term searched again for a longer duration")
+    
+    await empty_service.search_tracks(["obscure term"], 20)
+    if empty_client.searched_terms.count("obscure term") == 2:
+        print("✅ Empty term retried for a shorter duration")
+    else:
+        print("❌ Empty term not retried for a shorter duration")
+    
+    reset_client = FakeYTMusicClient({"obscure term": []})
+    reset_service = YouTubeMusicService(
+        reset_client, AudioConfig(search_cache_size=0, empty_term_reset_seconds=0)
+    )
+    await reset_service.search_tracks(["obscure term"], 30)
+    await reset_service.search_tracks(["obscure term"], 30)
+    if reset_client.searched_terms.count("obscure term") == 2:
+        print("✅ Empty term retried after the reset interval")
+    else:
+        print("❌ Empty term not retried after the reset interval")
+    
+    # Test that repeated searches are served from the term cache
+    print("\n7. Testing Search Cache")
+    print("-" * 30)
+    
+    cached_track = {"title": "Lofi Study Beats", "videoId": "lofi1", "duration_seconds": 120}
+    cache_client = FakeYTMusicClient({"lofi beats": [cached_track]})
+    cache_service = YouTubeMusicService(cache_client, AudioConfig())
+    
+    first_tracks = await cache_service.search_tracks(["lofi beats"], 30)
+    second_tracks = await cache_service.search_tracks(["lofi beats"], 30)
+    if cache_client.searched_terms.count("lofi beats") == 1 and second_tracks == first_tracks:
+        print("✅ Repeated search served from cache")
+    else:
+        print(f"❌ Client searched {cache_client.searched_terms.count('lofi beats')} times")
+    
+    # Searches left over once the quota is met still finish and fill the cache
+    quota_terms = ["t1", "t2", "t3", "t4", "t5"]
+    quota_client = FakeYTMusicClient({
+        term: [{"title": f"{term} track {i}", "videoId": f"{term}-{i}", "duration_seconds": 60}
+               for i in range(3)]
+        for term in quota_terms
+    }, slow_terms={"t4", "t5"})
+    quota_service = YouTubeMusicService(quota_client, AudioConfig(max_search_results=3))
+    
+    await quota_service.search_tracks(quota_terms, 30)
+    await asyncio.sleep(0.2)  # Let the searches no longer awaited complete
+    for _ in range(4):
+        await quota_service.search_tracks(quota_terms, 30)
+    if all(quota_client.searched_terms.count(term) == 1 for term in quota_terms):
+        print("✅ Searches past the quota cached, no repeat client calls")
+    else:
+        print(f"❌ Repeated searches reached the client: {quota_client.searched_terms}")
+    
+    # Test that concurrent identical requests share one analysis
+    print("\n8. Testing Analysis Coalescing")
+    print("-" * 30)
+    
+    try:
+        from tools import BGMTools
+    except ImportError as e:
+        print(f"⚠️  Skipped, tool dependencies not installed: {e}")
+    else:
+        arguments = {"script": "Coalesced script about a calm morning routine", "duration": 30}
+        
+        ScriptAnalyzer.clear_cache()
+        counting_analyzer = CountingScriptAnalyzer()
+        tools = BGMTools(recommendation_service, script_analyzer=counting_analyzer)
+        responses = await asyncio.gather(*[
+            tools.handle_tool_call("recommend_background_music", arguments) for _ in range(3)
+        ])
+        if counting_analyzer.analysis_count == 1 and all("detected_mood" in r[0].text for r in responses):
+            print("✅ Concurrent identical requests shared one analysis")
+        else:
+            print(f"❌ Script analyzed {counting_analyzer.analysis_count} times")
+        
+        # Cancelling one caller must not cancel the analysis the others await
+        ScriptAnalyzer.clear_cache()
+        counting_analyzer = CountingScriptAnalyzer()
+        tools = BGMTools(recommendation_service, script_analyzer=counting_analyzer)
+        cancelled_call = asyncio.create_task(
+            tools.handle_tool_call("recommend_background_music", arguments)
+        )
+        surviving_call = asyncio.create_task(
+            tools.handle_tool_call("recommend_background_music", arguments)
+        )
+        await asyncio.sleep(0.01)
+        cancelled_call.cancel()
+        response = await surviving_call
+        if counting_analyzer.analysis_count == 1 and "detected_mood" in response[0].text:
+            print("✅ Cancelled caller left the shared analysis running")
+        else:
+            print(f"❌ Shared analysis failed after cancel: {response[0].text[:80]}")
+    
     print("\n" + "=" * 50)
     print("All components tested successfully! 🎵")
 
@@ -1,72 +1,107 @@
 """
 MCP tool definitions and handlers.
 """
-from typing import Dict, Any, List
-import json
+from types import MappingProxyType
+from typing import Dict, Any, List, Optional, Tuple
+import asyncio
 import logging
 
 import mcp.types as types
+import orjson
 from mcp.types import Tool
 
 from config import ContentCategories
-from models import RecommendationRequest, RecommendationResponse
+from models import (
+    InputParameters, RecommendationRequest, RecommendationResponse, ScriptAnalysis, SearchInfo
+)
 from script_analyzer import ScriptAnalyzer
 from music_service import MusicRecommendationService
 
 logger = logging.getLogger(__name__)
 
+# Tool arguments that map directly onto RecommendationRequest fields
+_REQUEST_FIELDS = frozenset({
+    "script", "duration", "genre_preference", "mood_preference", "content_type"
+})
+
+# Tool schemas are constant for the process lifetime, so they are built once
+# and shared. Enums stay lists: JSON Schema validators only accept arrays.
+_TOOL_DEFINITIONS: List[Tool] = [
+    Tool(
+        name="recommend_background_music",
+        description="Analyze YouTube short script and recommend background music from YouTube Music",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "script": {
+                    "type": "string",
+                    "description": "The YouTube short script/content text",
+                    "minLength": 1
+                },
+                "duration": {
+                    "type": "integer",
+                    "description": "Duration of the short in seconds (15-60)",
+                    "minimum": 15,
+                    "maximum": 60
+                },
+                "genre_preference": {
+                    "type": "string",
+                    "description": "Optional genre preference",
+                    "enum": list(ContentCategories.GENRES_ORDERED),
+                    "default": "any"
+                },
+                "mood_preference": {
+                    "type": "string", 
+                    "description": "Optional mood preference",
+                    "enum": list(ContentCategories.MOODS_ORDERED),
+                    "default": "any"
+                },
+                "content_type": {
+                    "type": "string",
+                    "description": "Type of content being created",
+                    "enum": list(ContentCategories.CONTENT_TYPES_ORDERED),
+                    "default": "other"
+                }
+            },
+            "required": ["script", "duration"],
+            "additionalProperties": False
+        }
+    )
+]
+
+
+# Analyzer instances hold only read-only tables, so one is shared process-wide
+_shared_analyzer = ScriptAnalyzer()
+
 
 class BGMTools:
     """Handler for Background Music recommendation tools."""
     
-    def __init__(self, recommendation_service: MusicRecommendationService):
+    def __init__(self, recommendation_service: MusicRecommendationService,
+                 script_analyzer: Optional[ScriptAnalyzer] = None,
+                 max_concurrent_requests: int = 16):
+        if max_concurrent_requests < 1:
+            raise ValueError("max_concurrent_requests must be at least 1")
         self.recommendation_service = recommendation_service
-        self.script_analyzer = ScriptAnalyzer()
+        self.script_analyzer = script_analyzer or _shared_analyzer
+        # Caps concurrent upstream searches so bursts do not trip rate limits
+        self._recommendation_semaphore = asyncio.Semaphore(max_concurrent_requests)
+        # In-flight analyses, keyed like the analyzer cache and shared by duplicate calls
+        self._pending_analyses: Dict[Tuple[bytes, bool], asyncio.Task] = {}
+        self.refresh_api_status()
+        
+        # Tool name -> bound handler, fixed for the lifetime of the instance
+        self._dispatch = MappingProxyType({
+            "recommend_background_music": self._handle_music_recommendation,
+        })
+    
+    def refresh_api_status(self) -> None:
+        """Recompute the reported API status; call after swapping the music client."""
+        self._api_status = "active" if self.recommendation_service.music_service.client else "mock_mode"
     
     def get_tool_definitions(self) -> List[Tool]:
         """Return list of available tools."""
-        return [
-            Tool(
-                name="recommend_background_music",
-                description="Analyze YouTube short script and recommend background music from YouTube Music",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "script": {
-                            "type": "string",
-                            "description": "The YouTube short script/content text",
-                            "minLength": 1
-                        },
-                        "duration": {
-                            "type": "integer",
-                            "description": "Duration of the short in seconds (15-60)",
-                            "minimum": 15,
-                            "maximum": 60
-                        },
-                        "genre_preference": {
-                            "type": "string",
-                            "description": "Optional genre preference",
-                            "enum": ContentCategories.GENRES,
-                            "default": "any"
-                        },
-                        "mood_preference": {
-                            "type": "string", 
-                            "description": "Optional mood preference",
-                            "enum": ContentCategories.MOODS,
-                            "default": "any"
-                        },
-                        "content_type": {
-                            "type": "string",
-                            "description": "Type of content being created",
-                            "enum": ContentCategories.CONTENT_TYPES,
-                            "default": "other"
-                        }
-                    },
-                    "required": ["script", "duration"],
-                    "additionalProperties": False
-                }
-            )
-        ]
+        return _TOOL_DEFINITIONS
     
     async def handle_tool_call(self, name: str, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """
@@ -79,71 +114,134 @@ class BGMTools:
         Returns:
             List of text content responses
         """
-        if name == "recommend_background_music":
-            return await self._handle_music_recommendation(arguments)
-        else:
+        handler = self._dispatch.get(name)
+        if handler is None:
             raise ValueError(f"Unknown tool: {name}")
+        return await handler(arguments)
     
     async def _handle_music_recommendation(self, arguments: Dict[str, Any]) -> List[types.TextContent]:
         """Handle music recommendation requests."""
         try:
-            # Parse and validate request
-            request = RecommendationRequest(
-                script=arguments["script"],
-                duration=arguments["duration"],
-                genre_preference=arguments.get("genre_preference", "any"),
-                mood_preference=arguments.get("mood_preference", "any"),
-                content_type=arguments.get("content_type", "other")
-            )
-            request.validate()
+            request = self._parse_request(arguments)
             
-            logger.info(f"Processing {request.content_type} content, duration: {request.duration}s")
+            logger.info("Processing %s content, duration: %ds", request.content_type, request.duration)
             
-            # Analyze script
-            analysis = self.script_analyzer.analyze_script(request.script)
-            logger.info(f"Analysis complete: {analysis.detected_mood} mood, {analysis.detected_theme} theme")
+            # Analyze script off the event loop so concurrent calls keep flowing
+            analysis = await self._analyze_script(request.script)
+            logger.info("Analysis complete: %s mood, %s theme", analysis.detected_mood, analysis.detected_theme)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Analysis cache: %s", ScriptAnalyzer.cache_info())
             
             # Get music recommendations
-            recommendations = await self.recommendation_service.get_recommendations(
-                analysis, request.genre_preference, request.mood_preference, request.duration
-            )
+            async with self._recommendation_semaphore:
+                result = await self.recommendation_service.get_recommendations(
+                    analysis, request.genre_preference, request.mood_preference, request.duration
+                )
+            recommendations = result.recommendations
             
             # Build response
             response = RecommendationResponse(
                 analysis=analysis,
                 recommendations=recommendations,
-                input_parameters={
-                    "script_length": len(request.script),
-                    "duration": request.duration,
-                    "genre_preference": request.genre_preference,
-                    "mood_preference": request.mood_preference,
-                    "content_type": request.content_type
-                },
-                search_info={
-                    "search_terms_used": self.recommendation_service.generate_search_terms(
-                        analysis, request.genre_preference, request.mood_preference
-                    ),
-                    "total_recommendations": len(recommendations),
-                    "api_status": "active" if self.recommendation_service.music_service.client else "mock_mode"
-                }
+                input_parameters=InputParameters(
+                    script_length=request.script_length,
+                    duration=request.duration,
+                    genre_preference=request.genre_preference,
+                    mood_preference=request.mood_preference,
+                    content_type=request.content_type
+                ),
+                search_info=SearchInfo(
+                    search_terms_used=result.search_terms,
+                    total_recommendations=len(recommendations),
+                    api_status=self._api_status
+                )
             )
             
-            logger.info(f"Returning {len(recommendations)} recommendations")
+            logger.info("Returning %d recommendations", len(recommendations))
             
             return [types.TextContent(
                 type="text",
-                text=json.dumps(response.to_dict(), indent=2, ensure_ascii=False)
+                text=self._encode_response(response)
             )]
             
         except ValueError as e:
-            logger.error(f"Validation error: {e}")
+            # Expected client errors: log the message without a traceback
+            logger.error("Validation error: %s", e)
             return [types.TextContent(
                 type="text",
                 text=f"Error: {str(e)}"
             )]
         except Exception as e:
-            logger.error(f"Unexpected error in music recommendation: {e}", exc_info=True)
+            # Only truly unexpected failures pay for traceback formatting
+            logger.error("Unexpected error in music recommendation: %s", e, exc_info=True)
             return [types.TextContent(
                 type="text",
                 text=f"An unexpected error occurred: {str(e)}"
-            )]
\ No newline at end of file
+            )]
+    
+    def _parse_request(self, arguments: Dict[str, Any]) -> RecommendationRequest:
+        """
+        Build and validate a request from tool arguments.
+        
+        Omitted optional fields take the dataclass defaults. Validation is
+        kept because older MCP SDKs do not enforce the input schema.
+        
+        Args:
+            arguments: Tool arguments
+            
+        Returns:
+            Validated recommendation request
+            
+        Raises:
+            ValueError: If arguments are missing, mistyped or out of range
+        """
+        try:
+            request = RecommendationRequest(
+                **{key: arguments[key] for key in _REQUEST_FIELDS if key in arguments}
+            )
+            request.validate()
+        except TypeError as e:
+            raise ValueError(f"Invalid arguments: {e}") from e
+        
+        return request
+    
+    async def _analyze_script(self, script: str) -> ScriptAnalysis:
+        """
+        Analyze a script in a worker thread, coalescing concurrent duplicates.
+        
+        Calls that arrive while the same script is already being analyzed
+        await the in-flight analysis instead of starting their own.
+        
+        Args:
+            script: The video script text to analyze
+            
+        Returns:
+            ScriptAnalysis object with detected characteristics
+        """
+        cache_key = self.script_analyzer.cache_key(script)
+        task = self._pending_analyses.get(cache_key)
+        if task is None:
+            task = asyncio.create_task(
+                asyncio.to_thread(self.script_analyzer.analyze_script, script)
+            )
+            self._pending_analyses[cache_key] = task
+            task.add_done_callback(lambda _: self._pending_analyses.pop(cache_key, None))
+        
+        # Shield so one cancelled caller does not cancel the analysis for the others
+        return await asyncio.shield(task)
+    
+    def _encode_response(self, response: RecommendationResponse) -> str:
+        """
+        Serialize a response to JSON text in a single native pass.
+        
+        orjson walks the slotted dataclasses directly, so no intermediate
+        dict copy of the response is built.
+        
+        Args:
+            response: Complete recommendation response
+            
+        Returns:
+            JSON text, compact unless debug logging is enabled
+        """
+        options = orjson.OPT_INDENT_2 if logger.isEnabledFor(logging.DEBUG) else 0
+        return orjson.dumps(response, option=options).decode("utf-8")